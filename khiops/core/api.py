@@ -156,7 +156,7 @@ def _run_task(task_name, task_args):
         )
     finally:
         if task_called_with_domain and not trace:
-            fs.remove(task_args["dictionary_file_path"])
+            get_runner().remove_temp_file(task_args["dictionary_file_path"])
 
 
 def _preprocess_task_arguments(task_args):
@@ -1772,7 +1772,7 @@ def detect_data_table_format(
     if trace:
         print(f"detect_format log file: {log_file_path}")
     else:
-        fs.remove(log_file_path)
+        get_runner().remove_temp_file(log_file_path)
 
     return header_line, field_separator
 
@@ -439,7 +439,7 @@ def read_dictionary_file(dictionary_file_path):
 
     # Clean the temporary file if the input file was .kdic
     if extension == ".kdic":
-        fs.remove(tmp_dictionary_file_path)
+        get_runner().remove_temp_file(tmp_dictionary_file_path)
 
     return domain
 
@@ -582,6 +582,33 @@ class Dictionary:
                 i += len(variable_block.variables)
         return dictionary_copy
 
+    def copy_key_shell(self):
+        """Returns a shallow copy of this instance suitable for changing its key
+
+        Only the dictionary main features are copied: the `Variable`, `VariableBlock`
+        and `MetaData` objects are shared with this instance. Changing the ``name``,
+        ``label``, ``root`` or ``key`` attributes of the copy does not affect this
+        instance. Use `copy` if the variables or blocks are to be modified.
+
+        Returns
+        -------
+        `Dictionary`
+            A shallow copy of this instance.
+        """
+        dictionary_shell = Dictionary()
+        dictionary_shell.name = self.name
+        dictionary_shell.label = self.label
+        dictionary_shell.root = self.root
+        dictionary_shell.key = self.key.copy()
+        dictionary_shell.meta_data = self.meta_data
+        dictionary_shell.variables = self.variables.copy()
+        dictionary_shell.variable_blocks = self.variable_blocks.copy()
+        dictionary_shell._variables_by_name = self._variables_by_name.copy()
+        dictionary_shell._variable_blocks_by_name = (
+            self._variable_blocks_by_name.copy()
+        )
+        return dictionary_shell
+
     def get_value(self, key):
         """Returns the metadata value associated to the specified key
 
@@ -5,6 +5,9 @@
 # see the "LICENSE.md" file for more details.                                        #
 ######################################################################################
 """Helper functions for specific and/or advanced treatments"""
+import concurrent.futures
+import contextlib
+import functools
 import os
 
 import khiops.core.internals.filesystems as fs
@@ -20,6 +23,7 @@ from khiops.core.internals.common import (
     is_list_like,
     type_error_message,
 )
+from khiops.core.internals.runner import get_runner
 
 
 def build_multi_table_dictionary_domain(
@@ -108,6 +112,83 @@ def build_multi_table_dictionary_domain(
 # pylint: disable=protected-access
 
 
+@functools.lru_cache(maxsize=128)
+def _detect_format_cached(
+    data_table_path,
+    data_table_stamp,
+    dictionary_file_path,
+    dictionary_file_stamp,
+    dictionary_name,
+):
+    """Memoized version of `.detect_data_table_format` for dictionary files
+
+    The ``data_table_stamp`` and ``dictionary_file_stamp`` parameters are not used in
+    the detection: they are only part of the cache key so that a modified data table or
+    dictionary file is detected again.
+    """
+    # pylint: disable=unused-argument
+    return api.detect_data_table_format(
+        data_table_path, dictionary_file_path, dictionary_name
+    )
+
+
+def _get_file_stamp(file_path):
+    """Returns the (modification time, size) of a local file or None
+
+    None is returned when the file is remote or when it cannot be accessed.
+    """
+    if not fs.is_local_resource(file_path):
+        return None
+    try:
+        file_stat = os.stat(fs.create_resource(file_path).path)
+    except OSError:
+        return None
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def _detect_data_table_format(
+    data_table_path, dictionary_file_path_or_domain, dictionary_name
+):
+    """Detects the format of a data table, reusing previous results if possible
+
+    The detection is cached only for a local data table and a local dictionary file,
+    the cache key being their paths, modification times and sizes along with the
+    dictionary name. Detections with a `.DictionaryDomain` are never cached because
+    the domain may be modified in place.
+    """
+    # Detect directly if the inputs cannot be stamped
+    if isinstance(dictionary_file_path_or_domain, DictionaryDomain):
+        return api.detect_data_table_format(
+            data_table_path, dictionary_file_path_or_domain, dictionary_name
+        )
+    data_table_stamp = _get_file_stamp(data_table_path)
+    dictionary_file_stamp = _get_file_stamp(dictionary_file_path_or_domain)
+    if data_table_stamp is None or dictionary_file_stamp is None:
+        return api.detect_data_table_format(
+            data_table_path, dictionary_file_path_or_domain, dictionary_name
+        )
+
+    return _detect_format_cached(
+        data_table_path,
+        data_table_stamp,
+        dictionary_file_path_or_domain,
+        dictionary_file_stamp,
+        dictionary_name,
+    )
+
+
+def clear_format_cache():
+    """Clears the cache of data table formats detected by the helper functions
+
+    Helper functions such as `deploy_coclustering` memoize the format detected for a
+    local data table with a local dictionary file. A cached format is invalidated when
+    either file changes, as detected by its modification time and size. Detections with
+    a `.DictionaryDomain` object are not cached. Call this function to force a new
+    detection, for example if a file is rewritten without changing these attributes.
+    """
+    _detect_format_cached.cache_clear()
+
+
 def deploy_coclustering(
     dictionary_file_path_or_domain,
     dictionary_name,
@@ -129,6 +210,7 @@ def deploy_coclustering(
     build_frequency_variables=False,
     variables_prefix="",
     results_prefix="",
+    parallel=True,
     batch_mode=True,
     log_file_path=None,
     output_scenario_path=None,
@@ -194,6 +276,10 @@ def deploy_coclustering(
         Prefix for the variables in the deployment dictionary.
     results_prefix : str, default ""
         Prefix of the result files.
+    parallel : bool, default ``True``
+        If True the creation of the deployment dictionary and the extraction of the
+        keys are executed concurrently. Set it to False to run them sequentially (eg.
+        on machines with limited resources).
     ... :
         Options of the `.KhiopsRunner.run` method from the class `.KhiopsRunner`.
 
@@ -210,7 +296,8 @@ def deploy_coclustering(
     `TypeError`
         Invalid type ``dictionary_file_path_or_domain`` or ``key_variable_names``
     `ValueError`
-        If the type of the dictionary key variables is not equal to ``Categorical``
+        - If a key variable is not found in the dictionary
+        - If the type of the dictionary key variables is not equal to ``Categorical``
 
     Examples
     --------
@@ -235,7 +322,7 @@ def deploy_coclustering(
 
     # Detect the format once and for all to avoid inconsistencies
     if detect_format and header_line is None and field_separator is None:
-        header_line, field_separator = api.detect_data_table_format(
+        header_line, field_separator = _detect_data_table_format(
             data_table_path, dictionary_file_path_or_domain, dictionary_name
         )
     else:
@@ -247,17 +334,29 @@ def deploy_coclustering(
     # Access the dictionary in the relevant variables
     dictionary = domain.get_dictionary(dictionary_name)
 
-    # Verify that the key variables are categorical
+    # Verify that the key variables exist and are categorical
     for key_variable_name in key_variable_names:
-        key_variable = dictionary.get_variable(key_variable_name)
+        try:
+            key_variable = dictionary.get_variable(key_variable_name)
+        except KeyError as error:
+            raise ValueError(
+                f"key variable '{key_variable_name}' not found "
+                f"in dictionary '{dictionary_name}'"
+            ) from error
         if key_variable.type != "Categorical":
             raise ValueError(
                 "key variable types must be 'Categorical', "
                 f"variable '{key_variable_name}' has type '{key_variable.type}'"
             )
-    # Make a copy of the dictionary and set the id_variable as key
-    tmp_dictionary = dictionary.copy()
-    tmp_dictionary.key = key_variable_names
+    # Use the dictionary as-is if its key is made of the key variables. Otherwise make a
+    # shallow copy of it and set the key variables as its key.
+    # Note: A deep copy is not necessary because the dictionary variables are copied by
+    # build_multi_table_dictionary_domain
+    if list(dictionary.key) == list(key_variable_names):
+        tmp_dictionary = dictionary
+    else:
+        tmp_dictionary = dictionary.copy_key_shell()
+        tmp_dictionary.key = key_variable_names
     tmp_domain = DictionaryDomain()
     tmp_domain.add_dictionary(tmp_dictionary)
 
@@ -268,9 +367,19 @@ def deploy_coclustering(
         tmp_domain, root_dictionary_name, table_variable_name
     )
 
-    # Create the deployment dictionary
-    api.prepare_coclustering_deployment(
-        domain,
+    # Set the path of the keys table
+    get_results_child_path = fs.get_child_path_factory(results_dir)
+    data_table_file_name = os.path.basename(data_table_path)
+    keys_table_file_path = get_results_child_path(f"Keys{data_table_file_name}")
+
+    # Create the multi-table dictionary file shared by both tasks below
+    domain_file_path = get_runner().create_temp_file("_deploy_coclustering_", ".kdic")
+
+    # Create the deployment dictionary and extract the keys from the table to a
+    # temporary file. These tasks are independent so they may be run concurrently.
+    prepare_deployment_task = functools.partial(
+        api.prepare_coclustering_deployment,
+        domain_file_path,
         root_dictionary_name,
         coclustering_file_path,
         table_variable_name,
@@ -290,12 +399,9 @@ def deploy_coclustering(
         task_file_path=task_file_path,
         trace=trace,
     )
-
-    # Extract the keys from the tables to a temporary file
-    data_table_file_name = os.path.basename(data_table_path)
-    keys_table_file_path = fs.get_child_path(results_dir, f"Keys{data_table_file_name}")
-    api.extract_keys_from_data_table(
-        domain,
+    extract_keys_task = functools.partial(
+        api.extract_keys_from_data_table,
+        domain_file_path,
         dictionary_name,
         data_table_path,
         keys_table_file_path,
@@ -305,14 +411,34 @@ def deploy_coclustering(
         output_field_separator=field_separator,
         trace=trace,
     )
+    try:
+        # Write the multi-table dictionary file once for both tasks
+        domain.export_khiops_dictionary_file(domain_file_path)
+
+        if parallel:
+            # Initialize the runner beforehand: Its lazy initialization is not
+            # thread-safe and no Khiops call may have been made yet
+            api.get_khiops_version()
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                task_futures = [
+                    executor.submit(prepare_deployment_task),
+                    executor.submit(extract_keys_task),
+                ]
+                for task_future in task_futures:
+                    task_future.result()
+        else:
+            prepare_deployment_task()
+            extract_keys_task()
+    finally:
+        if trace:
+            print(f"Khiops coclustering deployment dictionary file: {domain_file_path}")
+        else:
+            get_runner().remove_temp_file(domain_file_path)
 
     # Deploy the coclustering model
-    coclustering_dictionary_file_path = fs.get_child_path(
-        results_dir, "Coclustering.kdic"
-    )
-    output_data_table_path = fs.get_child_path(
-        results_dir, f"Deployed{data_table_file_name}"
-    )
+    coclustering_dictionary_file_path = get_results_child_path("Coclustering.kdic")
+    output_data_table_path = get_results_child_path(f"Deployed{data_table_file_name}")
     additional_data_tables = {
         f"{root_dictionary_name}`{table_variable_name}": data_table_path
     }
@@ -331,6 +457,26 @@ def deploy_coclustering(
     return output_data_table_path, coclustering_dictionary_file_path
 
 
+@contextlib.contextmanager
+def deploy_coclustering_session():
+    """Context manager to reuse the temporary files of many `deploy_coclustering` calls
+
+    Within this context the temporary files (scenarios, logs and dictionaries) created
+    by the Khiops executions are reused by the next executions instead of being
+    created and removed each time. They are removed when the context exits.
+
+    Examples
+    --------
+    ::
+
+        with deploy_coclustering_session():
+            for data_table_path in data_table_paths:
+                deploy_coclustering(dictionary_file_path, ..., data_table_path, ...)
+    """
+    with get_runner().temp_file_pool():
+        yield
+
+
 def deploy_predictor_for_metrics(
     dictionary_file_path_or_domain,
     dictionary_name,
@@ -344,6 +490,7 @@ def deploy_predictor_for_metrics(
     additional_data_tables=None,
     output_header_line=True,
     output_field_separator="\t",
+    copy_domain=True,
     trace=False,
 ):
     r"""Deploys the necessary data to estimate the performance metrics of a predictor
@@ -390,6 +537,10 @@ def deploy_predictor_for_metrics(
         If True writes a header line containing the column names in the output table.
     output_field_separator : str, default "\\t"
         A field separator character ("" counts as "\\t").
+    copy_domain : bool, default ``True``
+        If True and ``dictionary_file_path_or_domain`` is a `.DictionaryDomain`, the
+        deployment is made on a copy of it. Otherwise the domain is modified in place
+        and its variables' ``used`` flags are restored at the end of the deployment.
     ... :
         Options of the `.KhiopsRunner.run` method from the class `.KhiopsRunner`.
     """
@@ -398,7 +549,10 @@ def deploy_predictor_for_metrics(
 
     # Load the dictionary file into a domain if necessary
     if isinstance(dictionary_file_path_or_domain, DictionaryDomain):
-        predictor_domain = dictionary_file_path_or_domain.copy()
+        if copy_domain:
+            predictor_domain = dictionary_file_path_or_domain.copy()
+        else:
+            predictor_domain = dictionary_file_path_or_domain
     else:
         predictor_domain = read_dictionary_file(dictionary_file_path_or_domain)
 
@@ -411,36 +565,45 @@ def deploy_predictor_for_metrics(
     predictor_type = predictor_dictionary.meta_data.get_value("PredictorType")
     is_classifier = predictor_type == "Classifier"
 
-    # Use the necessary columns
-    predictor_dictionary.use_all_variables(False)
+    # Save the used flags of the variables if the input domain is modified in place
+    is_domain_modified_in_place = predictor_domain is dictionary_file_path_or_domain
+    if is_domain_modified_in_place:
+        used_snapshot = [variable.used for variable in predictor_dictionary.variables]
+
+    # Use only the necessary columns, the metadata keys of each variable are scanned
+    # at most once and the scan stops at the first relevant key
     for variable in predictor_dictionary.variables:
-        if "TargetVariable" in variable.meta_data:
+        meta_data_keys = variable.meta_data.keys
+        if "TargetVariable" in meta_data_keys:
             variable.used = True
         elif is_classifier:
-            if "Prediction" in variable.meta_data:
-                variable.used = True
-            for key in variable.meta_data.keys:
-                if key.startswith("TargetProb"):
-                    variable.used = True
-        elif not is_classifier and "Mean" in variable.meta_data:
-            variable.used = True
-
-    # Deploy the scores
-    api.deploy_model(
-        predictor_domain,
-        dictionary_name,
-        data_table_path,
-        output_data_table_path,
-        detect_format=detect_format,
-        header_line=header_line,
-        field_separator=field_separator,
-        sample_percentage=sample_percentage,
-        sampling_mode=sampling_mode,
-        additional_data_tables=additional_data_tables,
-        output_header_line=output_header_line,
-        output_field_separator=output_field_separator,
-        trace=trace,
-    )
+            variable.used = "Prediction" in meta_data_keys or any(
+                key.startswith("TargetProb") for key in meta_data_keys
+            )
+        else:
+            variable.used = "Mean" in meta_data_keys
+
+    # Deploy the scores and restore the used flags if necessary
+    try:
+        api.deploy_model(
+            predictor_domain,
+            dictionary_name,
+            data_table_path,
+            output_data_table_path,
+            detect_format=detect_format,
+            header_line=header_line,
+            field_separator=field_separator,
+            sample_percentage=sample_percentage,
+            sampling_mode=sampling_mode,
+            additional_data_tables=additional_data_tables,
+            output_header_line=output_header_line,
+            output_field_separator=output_field_separator,
+            trace=trace,
+        )
+    finally:
+        if is_domain_modified_in_place:
+            for variable, used in zip(predictor_dictionary.variables, used_snapshot):
+                variable.used = used
 
 
 # pylint: enable=protected-access
@@ -324,6 +324,47 @@ def get_child_path(uri_or_path, child_name):
     return res.uri
 
 
+def get_child_path_factory(uri_or_path):
+    """Returns a function creating child paths of this URI
+
+    Contrary to calling `get_child_path` repeatedly, the URI is parsed only once and no
+    resource object is created for each child path.
+
+    Parameters
+    ----------
+    uri_or_path : str
+        The resource's URI or local filesystem path.
+
+    Returns
+    -------
+    callable
+        A function that takes a child name and returns the URI or path of the child
+        resource. Its return values are the same as those of `get_child_path`.
+
+    Raises
+    ------
+    ValueError
+        If the URI scheme is not supported.
+    """
+    # Local resource: The child path is built from the normalized local path
+    if is_local_resource(uri_or_path):
+        local_path = LocalFilesystemResource(uri_or_path).path
+
+        def _get_child_path(child_name):
+            return os.path.join(local_path, child_name)
+
+    # Remote resource: The child URI is built from the parsed URI
+    else:
+        uri_info = urlparse(uri_or_path, allow_fragments=False)
+        if uri_info.scheme not in ("s3", "gs"):
+            raise ValueError(f"Unsupported URI scheme {uri_info.scheme}")
+
+        def _get_child_path(child_name):
+            return child_uri_info(uri_info, child_name).geturl()
+
+    return _get_child_path
+
+
 def get_parent_path(uri_or_path):
     """Returns the specified parent path of this URI
 
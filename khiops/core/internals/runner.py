@@ -6,6 +6,7 @@
 ######################################################################################
 """Classes implementing Khiops Python' backend runners"""
 
+import contextlib
 import io
 import os
 import platform
@@ -14,6 +15,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import uuid
 import warnings
 from abc import ABC, abstractmethod
@@ -206,6 +208,14 @@ class KhiopsRunner(ABC):
         # For development uses only
         self._write_version = True
 
+        # Pool of reusable temporary files, active only within `temp_file_pool` contexts
+        # - _temp_file_pool: The released files for each (directory, prefix, suffix)
+        # - _temp_file_pool_keys: The (directory, prefix, suffix) of each pooled file
+        self._temp_file_pool = {}
+        self._temp_file_pool_keys = {}
+        self._temp_file_pool_depth = 0
+        self._temp_file_pool_lock = threading.Lock()
+
     def _initialize_root_temp_dir(self):
         """Initializes the runner's root temporary directory
 
@@ -297,12 +307,29 @@ class KhiopsRunner(ABC):
         if fs.is_local_resource(self.root_temp_dir):
             # Extract the path from the potential URI
             root_temp_dir_path = _extract_path_from_uri(self.root_temp_dir)
+            pool_key = (root_temp_dir_path, prefix, suffix)
+
+            with self._temp_file_pool_lock:
+                # Reuse a released file from the pool if possible, truncating it
+                # Note: Pooled files may have been deleted along with their directory
+                pooled_file_paths = self._temp_file_pool.get(pool_key, [])
+                while pooled_file_paths:
+                    tmp_file_path = pooled_file_paths.pop()
+                    if os.path.isfile(tmp_file_path):
+                        with open(tmp_file_path, "wb"):
+                            pass
+                        return tmp_file_path
+                    del self._temp_file_pool_keys[tmp_file_path]
+
+                # Create the temporary file
+                tmp_file_fd, tmp_file_path = tempfile.mkstemp(
+                    prefix=prefix, suffix=suffix, dir=root_temp_dir_path
+                )
+                os.close(tmp_file_fd)
 
-            # Create the temporary file
-            tmp_file_fd, tmp_file_path = tempfile.mkstemp(
-                prefix=prefix, suffix=suffix, dir=root_temp_dir_path
-            )
-            os.close(tmp_file_fd)
+                # Register the file to the pool if it is active
+                if self._temp_file_pool_depth > 0:
+                    self._temp_file_pool_keys[tmp_file_path] = pool_key
         # Remote resource: Just return a highly probable unique path
         else:
             tmp_file_path = fs.get_child_path(
@@ -311,6 +338,56 @@ class KhiopsRunner(ABC):
 
         return tmp_file_path
 
+    def remove_temp_file(self, tmp_file_path):
+        """Removes a temporary file created with `create_temp_file`
+
+        Within a `temp_file_pool` context the file is not removed if it was created in
+        it: It is kept to be reused by a later `create_temp_file` call with the same
+        root temporary directory, prefix and suffix.
+
+        Parameters
+        ----------
+        tmp_file_path : str
+            Path of a file returned by `create_temp_file`.
+        """
+        with self._temp_file_pool_lock:
+            pool_key = self._temp_file_pool_keys.get(tmp_file_path)
+            if pool_key is not None:
+                self._temp_file_pool.setdefault(pool_key, []).append(tmp_file_path)
+                return
+        fs.remove(tmp_file_path)
+
+    @contextlib.contextmanager
+    def temp_file_pool(self):
+        """Context manager reusing the local temporary files of this runner
+
+        Within this context, the local temporary files released with
+        `remove_temp_file` are kept and handed back by `create_temp_file` instead of
+        creating new ones. This saves the creation and deletion of files when the same
+        operations are executed many times. The pooled files are removed when the
+        outermost context exits.
+        """
+        with self._temp_file_pool_lock:
+            self._temp_file_pool_depth += 1
+        try:
+            yield self
+        finally:
+            with self._temp_file_pool_lock:
+                self._temp_file_pool_depth -= 1
+                if self._temp_file_pool_depth == 0:
+                    pooled_file_paths = [
+                        tmp_file_path
+                        for tmp_file_paths in self._temp_file_pool.values()
+                        for tmp_file_path in tmp_file_paths
+                    ]
+                    self._temp_file_pool.clear()
+                    self._temp_file_pool_keys.clear()
+                else:
+                    pooled_file_paths = []
+            for tmp_file_path in pooled_file_paths:
+                if os.path.isfile(tmp_file_path):
+                    fs.remove(tmp_file_path)
+
     def create_temp_dir(self, prefix):
         """Creates a unique directory in the runner's root temporary directory
 
@@ -654,9 +731,9 @@ class KhiopsRunner(ABC):
                 print(f"Khiops execution scenario: {scenario_path}")
                 print(f"Khiops log file: {command_line_options.log_file_path}")
             else:
-                fs.remove(scenario_path)
+                self.remove_temp_file(scenario_path)
                 if tmp_log_file_path is not None:
-                    fs.remove(tmp_log_file_path)
+                    self.remove_temp_file(tmp_log_file_path)
 
     def _report_exit_status(
         self, tool_name, return_code, stdout, stderr, log_file_path
@@ -5,6 +5,7 @@
 # see the "LICENSE.md" file for more details.                                        #
 ######################################################################################
 """Classes for creating Khiops scenario files"""
+import os
 import re
 
 from khiops.core.internals.common import is_string_like
@@ -90,6 +91,17 @@ class ConfigurableKhiopsScenario:
 
         assert isinstance(self._parsed_template, list)
 
+        # Pre-encode the ASCII literal lines along with their line separator
+        # Note: These lines are written as-is in every scenario, so they are encoded
+        # only once. The non-ASCII lines are still encoded by the writer because their
+        # encoding depends on its settings.
+        self._compiled_template = [
+            bytes(entry + os.linesep, "ascii")
+            if isinstance(entry, str) and entry.isascii()
+            else entry
+            for entry in self._parsed_template
+        ]
+
     def _parse_section(self, section_keyword, line_iter):
         # Obtain the end keyword
         end_section_keyword = f"__END_{section_keyword[2:]}"
@@ -238,8 +250,10 @@ class ConfigurableKhiopsScenario:
         scenario_args : dict
             Values of the scenario template arguments.
         """
-        for entry in self._parsed_template:
-            if isinstance(entry, str):
+        for entry in self._compiled_template:
+            if isinstance(entry, bytes):
+                writer.write(entry)
+            elif isinstance(entry, str):
                 writer.writeln(entry)
             else:
                 assert isinstance(entry, tuple)
@@ -1694,6 +1694,34 @@ class KhiopsCoreServicesTests(unittest.TestCase):
                     removed_value = variable_block.meta_data.remove_key("SomeKey")
                     self.assertEqual(removed_value, "SomeValue")
 
+    def test_dictionary_copy_key_shell(self):
+        """Tests that the key shell copy of a dictionary shares its variables"""
+        # Set the test paths
+        test_resources_dir = os.path.join(resources_dir(), "dictionary")
+        ref_kdicj_dir = os.path.join(test_resources_dir, "ref_kdicj")
+
+        # Test the key shell copy in different dictionary files
+        domain_names = ["Adult", "Customer", "SpliceJunction", "SpliceJunctionModeling"]
+        for domain_name in domain_names:
+            kdicj_path = os.path.join(ref_kdicj_dir, f"{domain_name}.kdicj")
+            domain = kh.read_dictionary_file(kdicj_path)
+            for dictionary in domain.dictionaries:
+                # Check that the shell is written as the original dictionary
+                dictionary_shell = dictionary.copy_key_shell()
+                self.assertEqual(str(dictionary_shell), str(dictionary))
+                for variable in dictionary.variables:
+                    self.assertIs(
+                        dictionary_shell.get_variable(variable.name), variable
+                    )
+
+                # Check that modifying the shell main features does not modify the
+                # original
+                original_key = dictionary.key.copy()
+                dictionary_shell.name = f"Shell{dictionary.name}"
+                dictionary_shell.key.append("ShellKey")
+                self.assertEqual(dictionary.key, original_key)
+                self.assertNotEqual(dictionary.name, dictionary_shell.name)
+
     def test_dictionary_extract_data_paths(self):
         """Tests the extract_data_paths Dictionary method"""
         # Set the test paths
@@ -5,10 +5,46 @@
 # see the "LICENSE.md" file for more details.                                        #
 ######################################################################################
 """Tests for checking the output types of predictors"""
+import os
+import shutil
+import tempfile
+import time
 import unittest
+from unittest import mock
 
+from khiops.core import helpers
 from khiops.core.dictionary import DictionaryDomain
 from khiops.core.helpers import build_multi_table_dictionary_domain
+from khiops.core.internals.runner import KhiopsLocalRunner, get_runner, set_runner
+from khiops.core.internals.version import KhiopsVersion
+
+# Disable warning about access to protected member: These are tests
+# pylint: disable=protected-access
+
+
+class FakeKhiopsLocalRunner(KhiopsLocalRunner):
+    """Local runner that records its Khiops executions instead of running them
+
+    Its lazy initialization is slow so that concurrent initializations overlap.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.initialization_count = 0
+        self.tool_names = []
+
+    def _initialize_khiops_environment(self):
+        self.initialization_count += 1
+        time.sleep(0.1)
+        self.execute_with_modl = False
+        self.mpi_command_args = []
+        self._khiops_bin_dir = ""
+        self._khiops_version = KhiopsVersion("10.2.0")
+        self.is_initialized = True
+
+    def raw_run(self, tool_name, command_line_args=None, use_mpi=True, trace=False):
+        self.tool_names.append(tool_name)
+        return "", "", 0
 
 
 class KhiopsHelperFunctions(unittest.TestCase):
@@ -91,3 +127,336 @@ class KhiopsHelperFunctions(unittest.TestCase):
             for test_var, ref_var in zip(test_dict.variables, ref_dict.variables):
                 self.assertEqual(test_var.name, ref_var.name)
                 self.assertEqual(test_var.type, ref_var.type)
+
+    def test_detect_data_table_format_cache(self):
+        """Test that the format detection is cached until the input files change"""
+        helpers.clear_format_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_table_path = os.path.join(tmp_dir, "Iris.txt")
+            with open(data_table_path, "w", encoding="ascii") as data_table_file:
+                data_table_file.write("Class\nse\n")
+            dictionary_file_path = os.path.join(tmp_dir, "Iris.kdic")
+            with open(dictionary_file_path, "w", encoding="ascii") as kdic_file:
+                kdic_file.write("Dictionary Iris\n{\n};\n")
+
+            with mock.patch.object(
+                helpers.api, "detect_data_table_format", return_value=(True, "\t")
+            ) as mock_detect:
+                # Repeated detections on the same table launch only one detection
+                for _ in range(3):
+                    format_spec = helpers._detect_data_table_format(
+                        data_table_path, dictionary_file_path, "Iris"
+                    )
+                    self.assertEqual(format_spec, (True, "\t"))
+                self.assertEqual(mock_detect.call_count, 1)
+
+                # A modification of the table triggers a new detection
+                with open(data_table_path, "a", encoding="ascii") as data_table_file:
+                    data_table_file.write("vi\n")
+                helpers._detect_data_table_format(
+                    data_table_path, dictionary_file_path, "Iris"
+                )
+                self.assertEqual(mock_detect.call_count, 2)
+
+                # A modification of the dictionary file triggers a new detection
+                with open(dictionary_file_path, "a", encoding="ascii") as kdic_file:
+                    kdic_file.write("Dictionary Iris2\n{\n};\n")
+                helpers._detect_data_table_format(
+                    data_table_path, dictionary_file_path, "Iris"
+                )
+                self.assertEqual(mock_detect.call_count, 3)
+
+                # Clearing the cache triggers a new detection
+                helpers.clear_format_cache()
+                helpers._detect_data_table_format(
+                    data_table_path, dictionary_file_path, "Iris"
+                )
+                self.assertEqual(mock_detect.call_count, 4)
+
+                # Detections with a dictionary domain are not cached
+                domain = DictionaryDomain()
+                for _ in range(2):
+                    helpers._detect_data_table_format(data_table_path, domain, "Iris")
+                self.assertEqual(mock_detect.call_count, 6)
+
+    def test_deploy_predictor_for_metrics_in_place(self):
+        """Test that the in-place deployment restores the used flags of the domain"""
+        predictor_domain = DictionaryDomain(
+            {
+                "tool": "Khiops Dictionary",
+                "version": "10.0",
+                "dictionaries": [
+                    {
+                        "name": "SNB_Iris",
+                        "metaData": {"PredictorType": "Classifier"},
+                        "variables": [
+                            {"name": "PetalLength", "type": "Numerical"},
+                            {
+                                "name": "Class",
+                                "type": "Categorical",
+                                "used": False,
+                                "metaData": {"TargetVariable": True},
+                            },
+                            {
+                                "name": "ProbClassse",
+                                "type": "Numerical",
+                                "metaData": {"TargetProbse": True},
+                            },
+                        ],
+                    }
+                ],
+            }
+        )
+        predictor_dictionary = predictor_domain.get_dictionary("SNB_Iris")
+
+        # Check that the deployed domain is the input one with only the metrics used
+        def check_deployed_domain(deployed_domain, *args, **kwargs):
+            # pylint: disable=unused-argument
+            self.assertIs(deployed_domain, predictor_domain)
+            self.assertEqual(
+                [variable.used for variable in predictor_dictionary.variables],
+                [False, True, True],
+            )
+
+        with mock.patch.object(
+            helpers.api, "deploy_model", side_effect=check_deployed_domain
+        ) as mock_deploy_model:
+            helpers.deploy_predictor_for_metrics(
+                predictor_domain,
+                "SNB_Iris",
+                "Iris.txt",
+                "IrisMetrics.txt",
+                copy_domain=False,
+            )
+            self.assertEqual(mock_deploy_model.call_count, 1)
+
+        # Check that the original used flags were restored
+        self.assertEqual(
+            [variable.used for variable in predictor_dictionary.variables],
+            [True, False, True],
+        )
+
+    def _create_coclustering_table_domain(self):
+        """Creates the domain of a table to deploy a coclustering model on"""
+        return DictionaryDomain(
+            {
+                "tool": "Khiops Dictionary",
+                "version": "10.0",
+                "dictionaries": [
+                    {
+                        "name": "Iris",
+                        "variables": [
+                            {"name": "Id", "type": "Categorical"},
+                            {"name": "PetalLength", "type": "Numerical"},
+                        ],
+                    }
+                ],
+            }
+        )
+
+    def test_deploy_coclustering_tasks(self):
+        """Test the execution of the deploy_coclustering tasks"""
+        domain = self._create_coclustering_table_domain()
+        for parallel in (True, False):
+            with self.subTest(parallel=parallel):
+                with mock.patch.object(
+                    helpers.api, "prepare_coclustering_deployment"
+                ) as mock_prepare, mock.patch.object(
+                    helpers.api, "extract_keys_from_data_table"
+                ) as mock_extract, mock.patch.object(
+                    helpers.api, "deploy_model"
+                ) as mock_deploy_model, mock.patch.object(
+                    helpers.api, "get_khiops_version"
+                ):
+                    # Check that both tasks are executed before the deployment
+                    helpers.deploy_coclustering(
+                        domain,
+                        "Iris",
+                        "Iris.txt",
+                        "Coclustering.khcj",
+                        ["Id"],
+                        "IrisClusters",
+                        "results",
+                        header_line=True,
+                        field_separator="\t",
+                        parallel=parallel,
+                    )
+                    self.assertEqual(mock_prepare.call_count, 1)
+                    self.assertEqual(mock_extract.call_count, 1)
+                    self.assertEqual(mock_deploy_model.call_count, 1)
+
+                    # Check that both tasks share the same deployment dictionary file
+                    # and that it is removed afterwards
+                    domain_file_path = mock_prepare.call_args.args[0]
+                    self.assertEqual(mock_extract.call_args.args[0], domain_file_path)
+                    self.assertFalse(os.path.exists(domain_file_path))
+
+                    # Check that an exception of the first task is propagated and
+                    # that the deployment dictionary file is released
+                    mock_prepare.reset_mock()
+                    mock_deploy_model.reset_mock()
+                    mock_prepare.side_effect = RuntimeError("preparation failed")
+                    with self.assertRaisesRegex(RuntimeError, "preparation failed"):
+                        helpers.deploy_coclustering(
+                            domain,
+                            "Iris",
+                            "Iris.txt",
+                            "Coclustering.khcj",
+                            ["Id"],
+                            "IrisClusters",
+                            "results",
+                            header_line=True,
+                            field_separator="\t",
+                            parallel=parallel,
+                        )
+                    domain_file_path = mock_prepare.call_args.args[0]
+                    self.assertFalse(os.path.exists(domain_file_path))
+                    self.assertEqual(mock_deploy_model.call_count, 0)
+
+                    # Check that the deployment dictionary file is released when its
+                    # export fails
+                    mock_prepare.reset_mock()
+                    tmp_file_names = set(os.listdir(get_runner().root_temp_dir))
+                    with mock.patch.object(
+                        helpers.DictionaryDomain,
+                        "export_khiops_dictionary_file",
+                        side_effect=OSError("export failed"),
+                    ):
+                        with self.assertRaisesRegex(OSError, "export failed"):
+                            helpers.deploy_coclustering(
+                                domain,
+                                "Iris",
+                                "Iris.txt",
+                                "Coclustering.khcj",
+                                ["Id"],
+                                "IrisClusters",
+                                "results",
+                                header_line=True,
+                                field_separator="\t",
+                                parallel=parallel,
+                            )
+                    self.assertEqual(mock_prepare.call_count, 0)
+                    self.assertEqual(
+                        set(os.listdir(get_runner().root_temp_dir)), tmp_file_names
+                    )
+
+    def test_deploy_coclustering_runner_initialization(self):
+        """Test that the concurrent deploy_coclustering tasks initialize the runner"""
+        runner = get_runner()
+        fake_runner = FakeKhiopsLocalRunner()
+        set_runner(fake_runner)
+        try:
+            with mock.patch(
+                "khiops.get_compatible_khiops_version",
+                return_value=KhiopsVersion("10.2.0"),
+            ):
+                helpers.deploy_coclustering(
+                    self._create_coclustering_table_domain(),
+                    "Iris",
+                    "Iris.txt",
+                    "Coclustering.khcj",
+                    ["Id"],
+                    "IrisClusters",
+                    "results",
+                    header_line=True,
+                    field_separator="\t",
+                    parallel=True,
+                )
+        finally:
+            set_runner(runner)
+        self.assertEqual(fake_runner.initialization_count, 1)
+        self.assertEqual(
+            sorted(fake_runner.tool_names),
+            ["khiops", "khiops", "khiops_coclustering"],
+        )
+
+    def test_deploy_coclustering_invalid_key(self):
+        """Test that deploy_coclustering fails with an invalid key variable"""
+        domain = self._create_coclustering_table_domain()
+        with mock.patch.object(
+            helpers.api, "prepare_coclustering_deployment"
+        ) as mock_prepare, mock.patch.object(
+            helpers.api, "extract_keys_from_data_table"
+        ) as mock_extract:
+            for key_variable_name, expected_message in [
+                ("Unknown", "key variable 'Unknown' not found in dictionary 'Iris'"),
+                ("PetalLength", "key variable types must be 'Categorical'"),
+            ]:
+                with self.subTest(key_variable_name=key_variable_name):
+                    with self.assertRaisesRegex(ValueError, expected_message):
+                        helpers.deploy_coclustering(
+                            domain,
+                            "Iris",
+                            "Iris.txt",
+                            "Coclustering.khcj",
+                            [key_variable_name],
+                            "IrisClusters",
+                            "results",
+                            header_line=True,
+                            field_separator="\t",
+                        )
+            self.assertEqual(mock_prepare.call_count, 0)
+            self.assertEqual(mock_extract.call_count, 0)
+
+    def test_deploy_coclustering_session(self):
+        """Test that the temporary files are reused within a session"""
+        runner = get_runner()
+        with helpers.deploy_coclustering_session():
+            # Check that a released file is reused and truncated
+            tmp_file_path = runner.create_temp_file("_test_session_", ".kdic")
+            with open(tmp_file_path, "w", encoding="ascii") as tmp_file:
+                tmp_file.write("Dictionary")
+            runner.remove_temp_file(tmp_file_path)
+            self.assertTrue(os.path.exists(tmp_file_path))
+            reused_tmp_file_path = runner.create_temp_file("_test_session_", ".kdic")
+            self.assertEqual(reused_tmp_file_path, tmp_file_path)
+            self.assertEqual(os.path.getsize(reused_tmp_file_path), 0)
+
+            # Check that files with other prefixes or suffixes are not reused
+            other_tmp_file_path = runner.create_temp_file("_test_session_", ".log")
+            self.assertNotEqual(other_tmp_file_path, tmp_file_path)
+            runner.remove_temp_file(reused_tmp_file_path)
+            runner.remove_temp_file(other_tmp_file_path)
+
+        # Check that the pooled files are removed at the end of the session
+        self.assertFalse(os.path.exists(tmp_file_path))
+        self.assertFalse(os.path.exists(other_tmp_file_path))
+
+        # Check that files are removed when released outside a session
+        tmp_file_path = runner.create_temp_file("_test_session_", ".kdic")
+        runner.remove_temp_file(tmp_file_path)
+        self.assertFalse(os.path.exists(tmp_file_path))
+
+    def test_deploy_coclustering_session_deleted_dir(self):
+        """Test that the pooled files of a deleted temporary directory are not reused"""
+        runner = get_runner()
+        root_temp_dir = runner.root_temp_dir
+        with helpers.deploy_coclustering_session():
+            # Release a file in a computation directory and then delete it, as done by
+            # the sklearn estimators
+            computation_dir = runner.create_temp_dir("_test_session_")
+            runner.root_temp_dir = computation_dir
+            try:
+                tmp_file_path = runner.create_temp_file("_run_", ".log")
+                runner.remove_temp_file(tmp_file_path)
+            finally:
+                runner.root_temp_dir = root_temp_dir
+            shutil.rmtree(computation_dir)
+
+            # Check that the file is not reused in the root temporary directory
+            other_tmp_file_path = runner.create_temp_file("_run_", ".log")
+            self.assertNotEqual(other_tmp_file_path, tmp_file_path)
+            self.assertTrue(os.path.isfile(other_tmp_file_path))
+            runner.remove_temp_file(other_tmp_file_path)
+
+            # Check that the file is not reused after restoring the deleted directory
+            os.makedirs(computation_dir)
+            runner.root_temp_dir = computation_dir
+            try:
+                new_tmp_file_path = runner.create_temp_file("_run_", ".log")
+                self.assertTrue(os.path.isfile(new_tmp_file_path))
+                runner.remove_temp_file(new_tmp_file_path)
+            finally:
+                runner.root_temp_dir = root_temp_dir
+        self.assertFalse(os.path.exists(other_tmp_file_path))
+        shutil.rmtree(computation_dir)
@@ -5,24 +5,51 @@
 # see the "LICENSE.md" file for more details.                                        #
 ######################################################################################
 """Tests for checking the output types of predictors"""
+import functools
 import os
 import unittest
+from collections import namedtuple
 
-import pandas as pd
+import numpy as np
 from numpy.testing import assert_array_equal
-from sklearn import datasets
-from sklearn.utils.validation import column_or_1d
-
-from khiops.sklearn.estimators import KhiopsClassifier, KhiopsRegressor
 
 # Disable PEP8 variable names because of scikit-learn X,y conventions
 # To capture invalid-names other than X,y run:
 #   pylint --disable=all --enable=invalid-names estimators.py
 # pylint: disable=invalid-name
 
+# Disable top-level import checks: pandas, scikit-learn and the estimators are imported
+# only by the functions using them so that collecting skipped tests stays fast
+# pylint: disable=import-outside-toplevel
+
+
+# Expected classes of the classifier for each target type
+_EXPECTED_CLASSES = {
+    "int": np.array([0, 1, 2]),
+    "int binary": np.array([0, 1]),
+    "string": np.array(["se", "ve", "vi"]),
+    "string binary": np.array(["ve", "vi_or_se"]),
+    "int as string": np.array(["10", "8", "9"]),
+    "int as string binary": np.array(["10", "89"]),
+    "cat int": np.array([0, 1, 2]),
+    "cat string": np.array(["se", "ve", "vi"]),
+}
+
+# A test configuration of the KhiopsClassifier output types
+ClassifierTestConfig = namedtuple(
+    "ClassifierTestConfig",
+    ["y_type", "y", "y_type_check", "expected_classes", "dataset_type", "X"],
+)
+
+# Note: The datasets are cached so all tests share them, they must not be modified
 
+
+@functools.lru_cache(maxsize=1)
 def create_iris():
     """Returns a mono table iris dataset"""
+    import pandas as pd
+    from sklearn import datasets
+
     X_iris_array, y_iris_array = datasets.load_iris(return_X_y=True)
     X_iris_df = pd.DataFrame(
         X_iris_array, columns=["SepalLenght", "SepalWidth", "PetalLength", "PetalWidth"]
@@ -31,10 +58,11 @@ def create_iris():
     return X_iris_df, y_iris_series
 
 
+@functools.lru_cache(maxsize=1)
 def create_iris_mt():
     """Returns a multitable table iris dataset"""
     X_iris_df, y_iris_series = create_iris()
-    X_iris_df["Id"] = X_iris_df.index
+    X_iris_df = X_iris_df.assign(Id=X_iris_df.index)
     X_iris_sec_df = X_iris_df.melt(
         id_vars=["Id"], var_name="Measurement", value_name="Value"
     )
@@ -54,83 +82,99 @@ class KhiopsSklearnOutputTypes(unittest.TestCase):
 
     def test_classifier_output_types(self):
         """Test the KhiopsClassifier output types and classes of predict* methods"""
+        import pandas as pd
+
+        from khiops.sklearn.estimators import KhiopsClassifier
+
         X, y = create_iris()
         X_mt, X_sec_mt, _ = create_iris_mt()
 
-        fixtures = {
-            "ys": {
-                "int": y,
-                "int binary": y.replace({0: 0, 1: 0, 2: 1}),
-                "string": y.replace({0: "se", 1: "vi", 2: "ve"}),
-                "string binary": y.replace({0: "vi_or_se", 1: "vi_or_se", 2: "ve"}),
-                "int as string": y.replace({0: "8", 1: "9", 2: "10"}),
-                "int as string binary": y.replace({0: "89", 1: "89", 2: "10"}),
-                "cat int": y.astype("category"),
-                "cat string": y.replace({0: "se", 1: "vi", 2: "ve"}).astype("category"),
-            },
-            "y_type_check": {
-                "int": pd.api.types.is_integer_dtype,
-                "int binary": pd.api.types.is_integer_dtype,
-                "string": pd.api.types.is_string_dtype,
-                "string binary": pd.api.types.is_string_dtype,
-                "int as string": pd.api.types.is_string_dtype,
-                "int as string binary": pd.api.types.is_string_dtype,
-                "cat int": pd.api.types.is_integer_dtype,
-                "cat string": pd.api.types.is_string_dtype,
-            },
-            "expected_classes": {
-                "int": column_or_1d([0, 1, 2]),
-                "int binary": column_or_1d([0, 1]),
-                "string": column_or_1d(["se", "ve", "vi"]),
-                "string binary": column_or_1d(["ve", "vi_or_se"]),
-                "int as string": column_or_1d(["10", "8", "9"]),
-                "int as string binary": column_or_1d(["10", "89"]),
-                "cat int": column_or_1d([0, 1, 2]),
-                "cat string": column_or_1d(["se", "ve", "vi"]),
-            },
-            "Xs": {
-                "mono": X,
-                "multi": {
-                    "main_table": "iris_main",
-                    "tables": {
-                        "iris_main": (X_mt, "Id"),
-                        "iris_sec": (X_sec_mt, "Id"),
-                    },
+        # Build the target variants by indexing arrays of labels with the class codes
+        y_codes = y.to_numpy()
+        y_string_values = np.array(["se", "vi", "ve"])[y_codes]
+
+        def build_y(values):
+            return pd.Series(values, index=y.index, name=y.name)
+
+        ys = {
+            "int": y,
+            "int binary": build_y(np.array([0, 0, 1])[y_codes]),
+            "string": build_y(y_string_values),
+            "string binary": build_y(np.array(["vi_or_se", "vi_or_se", "ve"])[y_codes]),
+            "int as string": build_y(np.array(["8", "9", "10"])[y_codes]),
+            "int as string binary": build_y(np.array(["89", "89", "10"])[y_codes]),
+            "cat int": build_y(
+                pd.Categorical.from_codes(y_codes, categories=[0, 1, 2])
+            ),
+            "cat string": build_y(pd.Categorical(y_string_values)),
+        }
+        y_type_checks = {
+            "int": pd.api.types.is_integer_dtype,
+            "int binary": pd.api.types.is_integer_dtype,
+            "string": pd.api.types.is_string_dtype,
+            "string binary": pd.api.types.is_string_dtype,
+            "int as string": pd.api.types.is_string_dtype,
+            "int as string binary": pd.api.types.is_string_dtype,
+            "cat int": pd.api.types.is_integer_dtype,
+            "cat string": pd.api.types.is_string_dtype,
+        }
+        Xs = {
+            "mono": X,
+            "multi": {
+                "main_table": "iris_main",
+                "tables": {
+                    "iris_main": (X_mt, "Id"),
+                    "iris_sec": (X_sec_mt, "Id"),
                 },
             },
         }
 
-        # Test for each fixture configuration
-        for y_type, y in fixtures["ys"].items():
-            y_type_check = fixtures["y_type_check"][y_type]
-            expected_classes = fixtures["expected_classes"][y_type]
-            for dataset_type, X in fixtures["Xs"].items():
-                with self.subTest(
-                    y_type=y_type,
-                    dataset_type=dataset_type,
-                    estimator=KhiopsClassifier.__name__,
-                ):
-                    # Train the classifier
-                    khc = KhiopsClassifier(n_trees=0)
-                    khc.fit(X, y)
-
-                    # Check the expected classes
-                    assert_array_equal(khc.classes_, expected_classes)
-
-                    # Check the return type of predict
-                    y_pred = khc.predict(X)
-                    self.assertTrue(
-                        y_type_check(y_pred),
-                        f"Invalid predict return type {y_pred.dtype}.",
-                    )
-
-                    # Check the dimensions of predict_proba
-                    y_probas = khc.predict_proba(X)
-                    self.assertEqual(len(y_probas.shape), 2)
-                    self.assertEqual(y_probas.shape[1], len(khc.classes_))
+        # Build the test configurations: One for each target and dataset type
+        configs = [
+            ClassifierTestConfig(
+                y_type=y_type,
+                y=y,
+                y_type_check=y_type_checks[y_type],
+                expected_classes=_EXPECTED_CLASSES[y_type],
+                dataset_type=dataset_type,
+                X=X,
+            )
+            for y_type, y in ys.items()
+            for dataset_type, X in Xs.items()
+        ]
+
+        # Test for each configuration
+        for config in configs:
+            with self.subTest(
+                y_type=config.y_type,
+                dataset_type=config.dataset_type,
+                estimator=KhiopsClassifier.__name__,
+            ):
+                # Train the classifier
+                khc = KhiopsClassifier(n_trees=0)
+                khc.fit(config.X, config.y)
+
+                # Check the expected classes
+                assert_array_equal(khc.classes_, config.expected_classes)
+
+                # Check the return type of predict
+                y_pred = khc.predict(config.X)
+                self.assertTrue(
+                    config.y_type_check(y_pred),
+                    f"Invalid predict return type {y_pred.dtype}.",
+                )
+
+                # Check the dimensions of predict_proba
+                y_probas = khc.predict_proba(config.X)
+                self.assertEqual(len(y_probas.shape), 2)
+                self.assertEqual(y_probas.shape[1], len(khc.classes_))
 
     def test_regression_output_types(self):
         """Test the KhiopsRegressor output types of the predict method"""
+        import pandas as pd
+
+        from khiops.sklearn.estimators import KhiopsClassifier, KhiopsRegressor
+
         X, y = create_iris()
         X_mt, X_sec_mt, _ = create_iris_mt()
 